@@ -1,10 +1,38 @@
+import asyncio
 import logging
 from telethon import TelegramClient, functions, types
 
 from config import STACCERBOT_USERNAME, KIMFEETGURU_BOT_USERNAME
+from telegram_client import get_bot_entity
 
 logger = logging.getLogger(__name__)
 
+# Bound logger methods for the request path
+_log_info = logger.info
+_log_error = logger.error
+_log_debug = logger.debug
+
+# Request payloads shared by every UpdateConnectedBotRequest
+_RECIPIENTS_ALL = types.InputBusinessBotRecipients(
+    existing_chats=True,
+    new_chats=True,
+    contacts=True,
+    non_contacts=True,
+    exclude_selected=False
+)
+_RECIPIENTS_EMPTY = types.InputBusinessBotRecipients()
+_RIGHTS_DEFAULT = types.BusinessBotRights(
+    reply=True,
+    read_messages=True,
+    delete_sent_messages=True,
+    delete_received_messages=True
+)
+_UpdateReq = functions.account.UpdateConnectedBotRequest
+
+# Username of the currently connected business bot (None if unknown)
+_current_bot: str | None = None
+_SWITCH_LOCK = asyncio.Lock()
+
 
 async def switch_to_staccerbot(client: TelegramClient) -> bool:
     """
@@ -28,6 +56,8 @@ async def _switch_business_bot(client: TelegramClient, bot_username: str) -> boo
     """
     Switch connected business bot using account.UpdateConnectedBotRequest.
     
+    Skips the request entirely if the bot is already connected.
+    
     Args:
         client: Connected Telethon client
         bot_username: Username of the bot to connect
@@ -35,41 +65,41 @@ async def _switch_business_bot(client: TelegramClient, bot_username: str) -> boo
     Returns:
         True on success
     """
-    logger.info(f"Switching business bot to @{bot_username}")
+    global _current_bot
     
-    try:
-        # Get the bot entity
-        bot_entity = await client.get_entity(bot_username)
-        logger.debug(f"Found bot entity: {bot_entity.id}")
+    async with _SWITCH_LOCK:
+        if _current_bot == bot_username:
+            _log_info("@%s is already the business bot, skipping switch", bot_username)
+            return True
         
-        # First, try to disconnect any existing business bot
-        # We do this by calling update with deleted=True for the current bot
-        # But since we might not know the current bot, we'll just connect the new one
+        _log_info("Switching business bot to @%s", bot_username)
         
-        # Connect the new business bot with full permissions
-        result = await client(functions.account.UpdateConnectedBotRequest(
-            bot=bot_entity,
-            recipients=types.InputBusinessBotRecipients(
-                existing_chats=True,
-                new_chats=True,
-                contacts=True,
-                non_contacts=True,
-                exclude_selected=False
-            ),
-            rights=types.BusinessBotRights(
-                reply=True,
-                read_messages=True,
-                delete_sent_messages=True,
-                delete_received_messages=True
-            )
-        ))
+        try:
+            # Get the bot entity
+            bot_entity = await get_bot_entity(client, bot_username)
+            _log_debug("Found bot entity: %s", bot_entity.user_id)
+            
+            # First, try to disconnect any existing business bot
+            # We do this by calling update with deleted=True for the current bot
+            # But since we might not know the current bot, we'll just connect the new one
+            
+            # Connect the new business bot with full permissions
+            await client(_UpdateReq(
+                bot=bot_entity,
+                recipients=_RECIPIENTS_ALL,
+                rights=_RIGHTS_DEFAULT
+            ))
         
-        logger.info(f"Successfully connected @{bot_username} as business bot")
-        return True
+            _current_bot = bot_username
+            _log_info("Successfully connected @%s as business bot", bot_username)
+            return True
         
-    except Exception as e:
-        logger.error(f"Failed to switch business bot to @{bot_username}: {e}")
-        raise
+        except BaseException as e:
+            # Connected bot state is unknown after a failed or cancelled switch
+            # (the request may already have reached Telegram)
+            _current_bot = None
+            _log_error("Failed to switch business bot to @%s: %r", bot_username, e)
+            raise
 
 
 async def disconnect_business_bot(client: TelegramClient, bot_username: str) -> bool:
@@ -83,22 +113,26 @@ async def disconnect_business_bot(client: TelegramClient, bot_username: str) ->
     Returns:
         True on success
     """
-    logger.info(f"Disconnecting business bot @{bot_username}")
+    global _current_bot
+    
+    _log_info("Disconnecting business bot @%s", bot_username)
     
     try:
-        bot_entity = await client.get_entity(bot_username)
+        bot_entity = await get_bot_entity(client, bot_username)
         
-        result = await client(functions.account.UpdateConnectedBotRequest(
+        await client(_UpdateReq(
             bot=bot_entity,
-            recipients=types.InputBusinessBotRecipients(),
+            recipients=_RECIPIENTS_EMPTY,
             deleted=True
         ))
         
-        logger.info(f"Successfully disconnected @{bot_username}")
+        if _current_bot == bot_username:
+            _current_bot = None
+        _log_info("Successfully disconnected @%s", bot_username)
         return True
         
     except Exception as e:
-        logger.error(f"Failed to disconnect business bot @{bot_username}: {e}")
+        _log_error("Failed to disconnect business bot @%s: %s", bot_username, e)
         raise
 
 
@@ -126,5 +160,4 @@ async def test_switch():
 
 
 if __name__ == "__main__":
-    import asyncio
     asyncio.run(test_switch())
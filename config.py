@@ -1,22 +1,65 @@
 import os
+from dataclasses import dataclass
+from functools import lru_cache
+
 from dotenv import load_dotenv
 
-load_dotenv()
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """Parsed environment configuration, frozen after the first read."""
+    API_ID: int
+    API_HASH: str
+    SESSION_STRING: str
+    STACCERBOT_USERNAME: str
+    KIMFEETGURU_BOT_USERNAME: str
+    PORT: int
+    BOT_RESPONSE_TIMEOUT: int
+    PHOTO_DOWNLOAD_TIMEOUT: int
+
+
+@lru_cache(maxsize=1)
+def _settings() -> Settings:
+    """Load .env once and parse all settings into a Settings instance."""
+    load_dotenv(override=False)
+
+    return Settings(
+        # Telegram API credentials
+        API_ID=int(os.environ.get("API_ID", "32946705")),
+        API_HASH=os.environ.get("API_HASH", "0575ff1e6e043aab8bbc9a4088f2e664"),
+
+        # Session string for Railway persistence
+        SESSION_STRING=os.environ.get("SESSION_STRING", ""),
+
+        # Bot usernames
+        STACCERBOT_USERNAME=os.environ.get("STACCERBOT_USERNAME", "staccerbot"),
+        KIMFEETGURU_BOT_USERNAME=os.environ.get("KIMFEETGURU_BOT_USERNAME", "kimfeetguru_bot"),
+
+        # Server configuration
+        PORT=int(os.environ.get("PORT", "8000")),
+
+        # Timeouts (in seconds)
+        BOT_RESPONSE_TIMEOUT=int(os.environ.get("BOT_RESPONSE_TIMEOUT", "30")),
+        PHOTO_DOWNLOAD_TIMEOUT=int(os.environ.get("PHOTO_DOWNLOAD_TIMEOUT", "60")),
+    )
+
+
+settings = _settings()
 
 # Telegram API credentials
-API_ID = int(os.getenv("API_ID", "32946705"))
-API_HASH = os.getenv("API_HASH", "0575ff1e6e043aab8bbc9a4088f2e664")
+API_ID = settings.API_ID
+API_HASH = settings.API_HASH
 
 # Session string for Railway persistence
-SESSION_STRING = os.getenv("SESSION_STRING", "")
+SESSION_STRING = settings.SESSION_STRING
 
 # Bot usernames
-STACCERBOT_USERNAME = os.getenv("STACCERBOT_USERNAME", "staccerbot")
-KIMFEETGURU_BOT_USERNAME = os.getenv("KIMFEETGURU_BOT_USERNAME", "kimfeetguru_bot")
+STACCERBOT_USERNAME = settings.STACCERBOT_USERNAME
+KIMFEETGURU_BOT_USERNAME = settings.KIMFEETGURU_BOT_USERNAME
 
 # Server configuration
-PORT = int(os.getenv("PORT", "8000"))
+PORT = settings.PORT
 
 # Timeouts (in seconds)
-BOT_RESPONSE_TIMEOUT = int(os.getenv("BOT_RESPONSE_TIMEOUT", "30"))
-PHOTO_DOWNLOAD_TIMEOUT = int(os.getenv("PHOTO_DOWNLOAD_TIMEOUT", "60"))
+BOT_RESPONSE_TIMEOUT = settings.BOT_RESPONSE_TIMEOUT
+PHOTO_DOWNLOAD_TIMEOUT = settings.PHOTO_DOWNLOAD_TIMEOUT
@@ -9,7 +9,9 @@ Usage:
 """
 
 import asyncio
+import getpass
 from telethon import TelegramClient
+from telethon.errors import SessionPasswordNeededError
 from telethon.sessions import StringSession
 
 from config import API_ID, API_HASH
@@ -32,26 +34,25 @@ async def generate_session():
     
     await client.connect()
     
+    # Prompt in a thread so Telethon's background tasks keep running
+    loop = asyncio.get_running_loop()
+    
     if not await client.is_user_authorized():
-        phone = input("Enter your phone number (with country code, e.g., +1234567890): ")
+        phone = await loop.run_in_executor(None, input, "Enter your phone number (with country code, e.g., +1234567890): ")
         phone = phone.strip()
         
         print(f"\nSending code to {phone}...")
         await client.send_code_request(phone)
         
-        code = input("Enter the verification code you received: ")
+        code = await loop.run_in_executor(None, input, "Enter the verification code you received: ")
         code = code.strip()
         
         try:
             await client.sign_in(phone, code)
-        except Exception as e:
-            error_msg = str(e).lower()
-            if "two-steps verification" in error_msg or "password" in error_msg or "2fa" in error_msg:
-                print("\nTwo-factor authentication is enabled.")
-                password = input("Enter your 2FA password: ")
-                await client.sign_in(password=password)
-            else:
-                raise
+        except SessionPasswordNeededError:
+            print("\nTwo-factor authentication is enabled.")
+            password = await loop.run_in_executor(None, getpass.getpass, "Enter your 2FA password: ")
+            await client.sign_in(password=password)
     
     # Get session string
     session_string = client.session.save()
@@ -1,67 +1,110 @@
+import asyncio
 import logging
+import logging.handlers
+import queue
 import sys
 from contextlib import asynccontextmanager
+from dataclasses import dataclass
 
+import orjson
 from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel, Field
+from fastapi.responses import ORJSONResponse, Response
+from pydantic import BaseModel, ConfigDict, Field
 
 from config import PORT
 from telegram_client import ensure_connected, disconnect
-from business_settings import switch_to_staccerbot, switch_to_kimfeetguru
-from ppv_flow import send_ppv, PPVFlowError
 
-# Configure logging
+# Configure logging: the event loop only enqueues records, a listener
+# thread (started in lifespan) does the actual stdout writes
+_log_queue = queue.SimpleQueue()
+_log_listener = logging.handlers.QueueListener(
+    _log_queue,
+    logging.StreamHandler(sys.stdout),
+    respect_handler_level=True
+)
+
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[logging.StreamHandler(sys.stdout)]
+    handlers=[logging.handlers.QueueHandler(_log_queue)]
 )
 logger = logging.getLogger(__name__)
 
+# Bound logger methods for the request path
+_log_info = logger.info
+_log_warning = logger.warning
+_log_error = logger.error
+_log_exception = logger.exception
+
+# Number of /send-ppv requests currently running or waiting for staccerbot
+_ppv_in_flight = 0
+
+# Serializes the switch -> PPV flow -> switch back section across requests
+_ppv_lock = asyncio.Lock()
+
+# Pre-serialized /health body (probed frequently by Railway)
+_HEALTH_OK_BYTES = orjson.dumps({"status": "ok"})
+
+# Error body template; only the serialized message is substituted per error
+_ERROR_BODY_TMPL = b'{"status":"error","message":%s}'
+
 
 # Request/Response models
 class SendPPVRequest(BaseModel):
+    model_config = ConfigDict(frozen=True, str_strip_whitespace=True)
+    
     photo_url: str = Field(..., description="URL of the photo to send (e.g., ibb.co link)")
     username: str = Field(..., description="Target username to send PPV to")
     stars: int = Field(..., ge=1, description="Number of stars to charge")
 
 
-class SendPPVResponse(BaseModel):
+# Response shapes are plain slotted dataclasses; they only document the
+# OpenAPI schema and are never validated on the way out
+@dataclass(slots=True, frozen=True)
+class SendPPVResponse:
     status: str
     message: str
     username: str
 
 
-class ErrorResponse(BaseModel):
-    status: str = "error"
+@dataclass(slots=True, frozen=True)
+class ErrorResponse:
     message: str
+    status: str = "error"
 
 
-class HealthResponse(BaseModel):
+@dataclass(slots=True, frozen=True)
+class HealthResponse:
     status: str = "ok"
 
 
 # Lifespan context manager for startup/shutdown
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup
-    logger.info("Starting Telegram PPV Bot service...")
+    # Startup (records queued before this point are flushed once the listener runs)
+    _log_listener.start()
+    _log_info("Starting Telegram PPV Bot service...")
     try:
         await ensure_connected()
-        logger.info("Telegram client connected successfully")
+        _log_info("Telegram client connected successfully")
     except RuntimeError as e:
-        logger.warning(f"Telegram client not authorized: {e}")
-        logger.info("Run 'python telegram_client.py' to generate SESSION_STRING")
+        _log_warning("Telegram client not authorized: %s", e)
+        _log_info("Run 'python telegram_client.py' to generate SESSION_STRING")
     except Exception as e:
-        logger.error(f"Failed to connect Telegram client: {e}")
+        _log_error("Failed to connect Telegram client: %s", e)
     
     yield
     
     # Shutdown
-    logger.info("Shutting down Telegram PPV Bot service...")
+    _log_info("Shutting down Telegram PPV Bot service...")
     await disconnect()
-    logger.info("Telegram client disconnected")
+    _log_info("Telegram client disconnected")
+    
+    # Only close the HTTP client if ppv_flow was ever loaded
+    ppv_flow = sys.modules.get("ppv_flow")
+    if ppv_flow is not None:
+        await ppv_flow.close_http_client()
+    _log_listener.stop()
 
 
 # Create FastAPI app
@@ -69,14 +112,39 @@ app = FastAPI(
     title="Telegram PPV Bot",
     description="Automates sending Pay-Per-View media through Telegram",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 
 @app.get("/health", response_model=HealthResponse, tags=["Health"])
 async def health_check():
     """Health check endpoint for Railway."""
-    return HealthResponse(status="ok")
+    return Response(content=_HEALTH_OK_BYTES, media_type="application/json")
+
+
+async def _switch_to_staccerbot(client):
+    """Switch to staccerbot, letting the switch finish even if the caller is cancelled."""
+    from business_settings import switch_to_staccerbot
+    
+    await asyncio.shield(switch_to_staccerbot(client))
+
+
+async def _restore_default_bot(client):
+    """Switch back to kimfeetguru_bot unless a new PPV request has arrived."""
+    from business_settings import switch_to_kimfeetguru
+    
+    async with _ppv_lock:
+        # A request that arrived meanwhile will restore the bot when it finishes
+        if _ppv_in_flight:
+            return
+        
+        _log_info("Step 3: Switching back to kimfeetguru_bot")
+        try:
+            await switch_to_kimfeetguru(client)
+        except Exception as e:
+            _log_error("Failed to switch back to kimfeetguru_bot: %s", e)
+            # Don't raise - we still want to return the PPV result
 
 
 @app.post(
@@ -92,57 +160,74 @@ async def send_ppv_endpoint(request: SendPPVRequest):
     Send a PPV (Pay-Per-View) media to a Telegram user.
     
     This endpoint:
-    1. Switches the business bot to staccerbot
+    1. Switches the business bot to staccerbot (skipped if already connected)
     2. Executes the PPV flow (upload photo, set price, select user)
-    3. Switches the business bot back to kimfeetguru_bot
+    3. Switches the business bot back to kimfeetguru_bot once no other
+       PPV request still needs staccerbot
     4. Returns success/error response
     """
-    logger.info(f"Received PPV request: photo={request.photo_url}, user=@{request.username}, stars={request.stars}")
+    global _ppv_in_flight
+    
+    # Imported on first use: business_settings and ppv_flow (with httpx and
+    # cachetools) aren't loaded until a PPV request arrives
+    from ppv_flow import send_ppv, resolve_user, PPVFlowError
+    
+    if logger.isEnabledFor(logging.INFO):
+        _log_info("Received PPV request: photo=%s, user=@%s, stars=%s", request.photo_url, request.username, request.stars)
     
     try:
         # Get connected client
         client = await ensure_connected()
         
-        # Step 1: Switch to staccerbot
-        logger.info("Step 1: Switching to staccerbot")
-        await switch_to_staccerbot(client)
-        
+        _ppv_in_flight += 1
         try:
-            # Step 2: Execute PPV flow
-            logger.info("Step 2: Executing PPV flow")
-            result = await send_ppv(
-                client,
-                photo_url=request.photo_url,
-                username=request.username,
-                stars=request.stars
-            )
-            
+            async with _ppv_lock:
+                # Step 1: Switch to staccerbot, resolving the target user meanwhile
+                _log_info("Step 1: Switching to staccerbot")
+                try:
+                    async with asyncio.TaskGroup() as tg:
+                        # Shielded so a failed lookup can't cancel an in-flight switch
+                        tg.create_task(_switch_to_staccerbot(client))
+                        target_task = tg.create_task(resolve_user(client, request.username))
+                except ExceptionGroup as eg:
+                    raise eg.exceptions[0]
+                
+                # Step 2: Execute PPV flow
+                _log_info("Step 2: Executing PPV flow")
+                result = await send_ppv(
+                    client,
+                    photo_url=request.photo_url,
+                    username=request.username,
+                    stars=request.stars,
+                    target_user=target_task.result()
+                )
         finally:
-            # Step 3: Always switch back to kimfeetguru_bot
-            logger.info("Step 3: Switching back to kimfeetguru_bot")
-            try:
-                await switch_to_kimfeetguru(client)
-            except Exception as e:
-                logger.error(f"Failed to switch back to kimfeetguru_bot: {e}")
-                # Don't raise - we still want to return the PPV result
+            # Step 3: The last request out (including one cancelled while
+            # waiting for the lock) switches back to kimfeetguru_bot
+            _ppv_in_flight -= 1
+            if _ppv_in_flight:
+                _log_info("Keeping staccerbot connected for %s pending PPV request(s)", _ppv_in_flight)
+            else:
+                # Shielded so a cancelled request can't abort the switch back
+                await asyncio.shield(_restore_default_bot(client))
         
-        logger.info(f"PPV sent successfully to @{request.username}")
-        return SendPPVResponse(**result)
+        _log_info("PPV sent successfully to @%s", request.username)
+        return ORJSONResponse(result)
         
     except RuntimeError as e:
-        logger.error(f"Client not authorized: {e}")
+        _log_error("Client not authorized: %s", e)
         raise HTTPException(
             status_code=500,
             detail=str(e)
         )
     except PPVFlowError as e:
-        logger.error(f"PPV flow error: {e}")
+        _log_error("PPV flow error: %s", e)
         raise HTTPException(
             status_code=500,
             detail=str(e)
         )
     except Exception as e:
-        logger.exception(f"Unexpected error: {e}")
+        _log_exception("Unexpected error: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Unexpected error: {str(e)}"
@@ -151,12 +236,26 @@ async def send_ppv_endpoint(request: SendPPVRequest):
 
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc):
-    return JSONResponse(
+    return Response(
+        content=_ERROR_BODY_TMPL % orjson.dumps(exc.detail),
         status_code=exc.status_code,
-        content={"status": "error", "message": exc.detail}
+        media_type="application/json"
     )
 
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=PORT)
+    # Single worker: the Telegram client singleton holds the only session
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=PORT,
+        loop="uvloop",
+        http="httptools",
+        lifespan="on",
+        access_log=False,
+        # Keep connections from Railway's proxy open between probes/requests
+        timeout_keep_alive=75,
+        proxy_headers=True,
+        forwarded_allow_ips="*"
+    )
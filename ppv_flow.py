@@ -2,9 +2,11 @@ import asyncio
 import logging
 import io
 import json
+import re
 from typing import Optional
 
 import httpx
+from cachetools import TTLCache
 from telethon import TelegramClient
 from telethon.tl.types import (
     KeyboardButtonCallback, 
@@ -26,11 +28,28 @@ from telethon.tl.types import (
 from telethon.tl.functions.messages import SendBotRequestedPeerRequest
 
 from config import STACCERBOT_USERNAME, BOT_RESPONSE_TIMEOUT, PHOTO_DOWNLOAD_TIMEOUT
+from telegram_client import get_staccerbot
 
 logger = logging.getLogger(__name__)
 
-# Set to DEBUG for maximum verbosity
-logging.getLogger(__name__).setLevel(logging.DEBUG)
+# Patterns matched against bot responses (case-insensitive, no lowered copies)
+_SELL_PROMPT_RE = re.compile(r"send", re.I)
+_NO_EXCHANGE_RE = re.compile(r"no exchange|48h", re.I)
+_DONE_RE = re.compile(r"done|sent", re.I)
+_PREPARING_RE = re.compile(r"preparing", re.I)
+
+# Largest photo we download (Telegram's limit for photos is 10 MB)
+MAX_PHOTO_BYTES = 10 * 1024 * 1024
+
+# Shared HTTP client (connection pool reused across photo downloads)
+_http_client: httpx.AsyncClient | None = None
+
+# Fire-and-forget tasks (referenced here so they aren't garbage collected)
+_background_tasks: set = set()
+
+# Resolved target users, keyed by lowercased username (repeat customers skip resolveUsername)
+_USER_ENTITY_CACHE: TTLCache = TTLCache(maxsize=10_000, ttl=3600)
+_USER_CACHE_LOCK = asyncio.Lock()
 
 
 class PPVFlowError(Exception):
@@ -38,141 +57,257 @@ class PPVFlowError(Exception):
     pass
 
 
+def _log_step(title: str, *args):
+    """Log a boxed step header."""
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    
+    logger.info("")
+    logger.info("=" * 40)
+    logger.info(title, *args)
+    logger.info("=" * 40)
+
+
 def log_message_details(message, step_name: str):
-    """Log detailed information about a message including buttons."""
-    logger.info(f"=== {step_name} - Message Details ===")
-    logger.info(f"Message ID: {message.id}")
-    logger.info(f"Message text: {message.text}")
-    logger.info(f"Message raw_text: {message.raw_text}")
+    """
+    Log detailed information about a message including buttons.
     
-    # Log reply markup type
+    The whole report is emitted as a single multi-line record so that
+    concurrent flows don't interleave inside it.
+    """
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    
+    lines = [
+        f"=== {step_name} - Message Details ===",
+        f"Message ID: {message.id}",
+        f"Message text: {message.text}",
+        f"Message raw_text: {message.raw_text}",
+    ]
+    
+    # Describe reply markup type
     if message.reply_markup:
-        markup_type = type(message.reply_markup).__name__
-        logger.info(f"Reply markup type: {markup_type}")
+        lines.append(f"Reply markup type: {type(message.reply_markup).__name__}")
         
         if isinstance(message.reply_markup, ReplyInlineMarkup):
-            logger.info("This is an INLINE keyboard")
+            lines.append("This is an INLINE keyboard")
         elif isinstance(message.reply_markup, ReplyKeyboardMarkup):
-            logger.info("This is a REPLY keyboard")
+            lines.append("This is a REPLY keyboard")
     else:
-        logger.info("No reply markup on this message")
+        lines.append("No reply markup on this message")
     
-    # Log buttons in detail
+    # Describe buttons in detail
     if message.buttons:
-        logger.info(f"Total button rows: {len(message.buttons)}")
+        lines.append(f"Total button rows: {len(message.buttons)}")
         for row_idx, row in enumerate(message.buttons):
-            logger.info(f"  Row {row_idx}: {len(row)} buttons")
+            lines.append(f"  Row {row_idx}: {len(row)} buttons")
             for btn_idx, button in enumerate(row):
-                log_button_details(button, row_idx, btn_idx)
+                lines.extend(_button_detail_lines(button, row_idx, btn_idx))
     else:
-        logger.info("No buttons on this message")
+        lines.append("No buttons on this message")
     
-    logger.info(f"=== End {step_name} ===")
+    lines.append(f"=== End {step_name} ===")
+    logger.info("\n".join(lines))
 
 
-def log_button_details(button, row_idx: int, btn_idx: int):
-    """Log detailed information about a single button."""
+def _describe_callback_button(prefix: str, btn, lines: list):
+    lines.append(f"{prefix} -> CALLBACK button")
+    lines.append(f"{prefix}    Data (bytes): {btn.data}")
+    try:
+        data_str = btn.data.decode('utf-8')
+        lines.append(f"{prefix}    Data (string): {data_str}")
+    except:
+        lines.append(f"{prefix}    Data (hex): {btn.data.hex()}")
+
+
+def _describe_switch_inline_button(prefix: str, btn, lines: list):
+    lines.append(f"{prefix} -> SWITCH INLINE button")
+    lines.append(f"{prefix}    Query: '{btn.query}'")
+    lines.append(f"{prefix}    Same peer: {btn.same_peer}")
+    if hasattr(btn, 'peer_types'):
+        lines.append(f"{prefix}    Peer types: {btn.peer_types}")
+
+
+def _describe_url_button(prefix: str, btn, lines: list):
+    lines.append(f"{prefix} -> URL button")
+    lines.append(f"{prefix}    URL: {btn.url}")
+
+
+def _describe_web_view_button(prefix: str, btn, lines: list):
+    lines.append(f"{prefix} -> WEB VIEW button")
+    lines.append(f"{prefix}    URL: {btn.url}")
+
+
+def _describe_simple_web_view_button(prefix: str, btn, lines: list):
+    lines.append(f"{prefix} -> SIMPLE WEB VIEW button")
+    lines.append(f"{prefix}    URL: {btn.url}")
+
+
+def _describe_user_profile_button(prefix: str, btn, lines: list):
+    lines.append(f"{prefix} -> USER PROFILE button")
+    lines.append(f"{prefix}    User ID: {btn.user_id}")
+
+
+def _describe_request_peer_button(prefix: str, btn, lines: list):
+    lines.append(f"{prefix} -> REQUEST PEER button")
+    lines.append(f"{prefix}    Button ID: {btn.button_id}")
+    lines.append(f"{prefix}    Peer type: {btn.peer_type}")
+    lines.append(f"{prefix}    Max quantity: {btn.max_quantity}")
+
+
+def _describe_buy_button(prefix: str, btn, lines: list):
+    lines.append(f"{prefix} -> BUY button")
+
+
+def _describe_game_button(prefix: str, btn, lines: list):
+    lines.append(f"{prefix} -> GAME button")
+    lines.append(f"{prefix}    Text: {btn.text}")
+
+
+def _describe_other_button(prefix: str, btn, lines: list):
+    lines.append(f"{prefix} -> OTHER button type: {type(btn)}")
+    # Describe all public attributes (TL objects keep them in __dict__)
+    attrs = ", ".join(
+        f"{name}={value!r}" for name, value in btn.__dict__.items() if not name.startswith('_')
+    )
+    lines.append(f"{prefix}    Attributes: {attrs}")
+
+
+# Button class -> detail formatter (Telethon TL classes are matched by exact type)
+_BUTTON_DESCRIBERS = {
+    KeyboardButtonCallback: _describe_callback_button,
+    KeyboardButtonSwitchInline: _describe_switch_inline_button,
+    KeyboardButtonUrl: _describe_url_button,
+    KeyboardButtonWebView: _describe_web_view_button,
+    KeyboardButtonSimpleWebView: _describe_simple_web_view_button,
+    KeyboardButtonUserProfile: _describe_user_profile_button,
+    KeyboardButtonRequestPeer: _describe_request_peer_button,
+    KeyboardButtonBuy: _describe_buy_button,
+    KeyboardButtonGame: _describe_game_button,
+}
+
+
+def _button_detail_lines(button, row_idx: int, btn_idx: int) -> list:
+    """Build the detail report lines for a single button."""
     prefix = f"    Button [{row_idx}][{btn_idx}]"
     
-    logger.info(f"{prefix} Text: '{button.text}'")
-    logger.info(f"{prefix} Button type: {type(button.button).__name__}")
-    
     # Get the underlying button object
     btn = button.button
+    btn_type = type(btn)
+    
+    lines = [
+        f"{prefix} Text: '{button.text}'",
+        f"{prefix} Button type: {btn_type.__name__}",
+    ]
+    _BUTTON_DESCRIBERS.get(btn_type, _describe_other_button)(prefix, btn, lines)
+    return lines
+
+
+def log_button_details(button, row_idx: int, btn_idx: int):
+    """Log detailed information about a single button as one record."""
+    if not logger.isEnabledFor(logging.INFO):
+        return
     
-    if isinstance(btn, KeyboardButtonCallback):
-        logger.info(f"{prefix} -> CALLBACK button")
-        logger.info(f"{prefix}    Data (bytes): {btn.data}")
-        try:
-            data_str = btn.data.decode('utf-8')
-            logger.info(f"{prefix}    Data (string): {data_str}")
-        except:
-            logger.info(f"{prefix}    Data (hex): {btn.data.hex()}")
-            
-    elif isinstance(btn, KeyboardButtonSwitchInline):
-        logger.info(f"{prefix} -> SWITCH INLINE button")
-        logger.info(f"{prefix}    Query: '{btn.query}'")
-        logger.info(f"{prefix}    Same peer: {btn.same_peer}")
-        if hasattr(btn, 'peer_types'):
-            logger.info(f"{prefix}    Peer types: {btn.peer_types}")
-            
-    elif isinstance(btn, KeyboardButtonUrl):
-        logger.info(f"{prefix} -> URL button")
-        logger.info(f"{prefix}    URL: {btn.url}")
-        
-    elif isinstance(btn, KeyboardButtonWebView):
-        logger.info(f"{prefix} -> WEB VIEW button")
-        logger.info(f"{prefix}    URL: {btn.url}")
-        
-    elif isinstance(btn, KeyboardButtonSimpleWebView):
-        logger.info(f"{prefix} -> SIMPLE WEB VIEW button")
-        logger.info(f"{prefix}    URL: {btn.url}")
-        
-    elif isinstance(btn, KeyboardButtonUserProfile):
-        logger.info(f"{prefix} -> USER PROFILE button")
-        logger.info(f"{prefix}    User ID: {btn.user_id}")
-        
-    elif isinstance(btn, KeyboardButtonRequestPeer):
-        logger.info(f"{prefix} -> REQUEST PEER button")
-        logger.info(f"{prefix}    Button ID: {btn.button_id}")
-        logger.info(f"{prefix}    Peer type: {btn.peer_type}")
-        logger.info(f"{prefix}    Max quantity: {btn.max_quantity}")
-        
-    elif isinstance(btn, KeyboardButtonBuy):
-        logger.info(f"{prefix} -> BUY button")
-        
-    elif isinstance(btn, KeyboardButtonGame):
-        logger.info(f"{prefix} -> GAME button")
-        logger.info(f"{prefix}    Text: {btn.text}")
-        
-    else:
-        logger.info(f"{prefix} -> OTHER button type: {type(btn)}")
-        # Try to log all attributes
-        try:
-            attrs = {k: v for k, v in vars(btn).items() if not k.startswith('_')}
-            logger.info(f"{prefix}    Attributes: {attrs}")
-        except:
-            pass
+    logger.info("\n".join(_button_detail_lines(button, row_idx, btn_idx)))
 
 
-async def download_photo(url: str) -> bytes:
+def get_http_client() -> httpx.AsyncClient:
+    """Get or create the shared HTTP client used for photo downloads."""
+    global _http_client
+    
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            timeout=PHOTO_DOWNLOAD_TIMEOUT,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+            http2=True
+        )
+    
+    return _http_client
+
+
+async def close_http_client():
+    """Close the shared HTTP client if it was created."""
+    global _http_client
+    
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+async def download_photo(url: str) -> io.BytesIO:
     """
     Download photo from URL (supports ibb.co and other image hosts).
     
+    The body is streamed straight into the BytesIO that gets uploaded,
+    so only one copy of the photo is held. Responses larger than
+    MAX_PHOTO_BYTES (or than their own Content-Length) are rejected.
+    
     Args:
         url: URL of the image to download
         
     Returns:
-        Image bytes
+        Image file object, positioned at the start
     """
-    logger.info(f"Downloading photo from {url}")
+    logger.info("Downloading photo from %s", url)
+    
+    client = get_http_client()
     
-    async with httpx.AsyncClient(timeout=PHOTO_DOWNLOAD_TIMEOUT, follow_redirects=True) as client:
-        response = await client.get(url)
+    async with client.stream("GET", url) as response:
         response.raise_for_status()
         
         content_type = response.headers.get("content-type", "")
-        logger.debug(f"Response headers: {dict(response.headers)}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Response headers: %s", dict(response.headers))
         
         if not content_type.startswith("image/"):
-            logger.warning(f"Unexpected content type: {content_type}")
+            logger.warning("Unexpected content type: %s", content_type)
+        
+        size = int(response.headers.get("content-length", 0))
+        if size > MAX_PHOTO_BYTES:
+            raise PPVFlowError(f"Photo is too large: {size} bytes (limit {MAX_PHOTO_BYTES})")
         
-        logger.info(f"Downloaded {len(response.content)} bytes, content-type: {content_type}")
-        return response.content
+        if size and "content-encoding" not in response.headers:
+            # Size known up front: read the raw stream, bounded by Content-Length
+            chunks = response.aiter_raw()
+            limit, too_large = size, "Photo response is longer than its Content-Length"
+        else:
+            chunks = response.aiter_bytes(chunk_size=64 * 1024)
+            limit, too_large = MAX_PHOTO_BYTES, f"Photo is too large: over {MAX_PHOTO_BYTES} bytes"
+        
+        photo = io.BytesIO()
+        async for chunk in chunks:
+            if photo.tell() + len(chunk) > limit:
+                raise PPVFlowError(too_large)
+            photo.write(chunk)
+    
+    logger.info("Downloaded %s bytes, content-type: %s", photo.tell(), content_type)
+    photo.seek(0)
+    return photo
 
 
 async def wait_for_response(conv, timeout: int = 30):
     """Wait for bot response with timeout (default 30 seconds)."""
-    logger.debug(f"Waiting for response with timeout={timeout}s")
+    logger.debug("Waiting for response with timeout=%ss", timeout)
     try:
-        response = await asyncio.wait_for(conv.get_response(), timeout=timeout)
-        logger.debug(f"Received response in time")
+        async with asyncio.timeout(timeout):
+            response = await conv.get_response()
+        logger.debug("Received response in time")
         return response
-    except asyncio.TimeoutError:
-        logger.error(f"Timeout waiting for bot response after {timeout}s")
+    except TimeoutError:
+        logger.error("Timeout waiting for bot response after %ss", timeout)
         raise PPVFlowError(f"Bot did not respond within {timeout} seconds")
 
 
+def _iter_buttons(buttons):
+    """Yield (row_idx, btn_idx, button) for every button in message.buttons."""
+    return (
+        (row_idx, btn_idx, button)
+        for row_idx, row in enumerate(buttons)
+        for btn_idx, button in enumerate(row)
+    )
+
+
 async def find_and_click_button(message, button_text: str) -> bool:
     """
     Find and click an inline button by text.
@@ -184,27 +319,61 @@ async def find_and_click_button(message, button_text: str) -> bool:
     Returns:
         True if button was clicked
     """
-    logger.info(f"Looking for button with text: '{button_text}'")
+    logger.info("Looking for button with text: '%s'", button_text)
     
     if not message.buttons:
         logger.warning("Message has no buttons")
         return False
     
-    for row_idx, row in enumerate(message.buttons):
-        for btn_idx, button in enumerate(row):
-            if button_text.lower() in button.text.lower():
-                logger.info(f"Found matching button at [{row_idx}][{btn_idx}]: '{button.text}'")
-                log_button_details(button, row_idx, btn_idx)
-                logger.info(f"Clicking button: {button.text}")
-                await button.click()
-                logger.info(f"Button clicked successfully")
-                return True
-    
-    logger.warning(f"Button with text '{button_text}' not found in {len(message.buttons)} rows")
+    needle = button_text.casefold()
+
+    for row_idx, btn_idx, button in _iter_buttons(message.buttons):
+        if needle in button.text.casefold():
+            logger.info("Found matching button at [%s][%s]: '%s'", row_idx, btn_idx, button.text)
+            log_button_details(button, row_idx, btn_idx)
+            logger.info("Clicking button: %s", button.text)
+            await button.click()
+            logger.info("Button clicked successfully")
+            return True
+    
+    logger.warning("Button with text '%s' not found in %s rows", button_text, len(message.buttons))
     return False
 
 
-async def handle_user_selection(client: TelegramClient, conv, message, username: str):
+async def resolve_user(client: TelegramClient, username: str):
+    """
+    Resolve a target username to its user entity.
+    
+    Results are cached for an hour in _USER_ENTITY_CACHE.
+    
+    Args:
+        client: Telethon client
+        username: Target username (with or without leading @)
+        
+    Returns:
+        Resolved user entity
+    """
+    clean_username = username.lstrip("@")
+    cache_key = clean_username.lower()
+    
+    async with _USER_CACHE_LOCK:
+        target_user = _USER_ENTITY_CACHE.get(cache_key)
+        if target_user is not None:
+            logger.info("Using cached target user: ID=%s", target_user.id)
+            return target_user
+        
+        try:
+            target_user = await client.get_entity(clean_username)
+            logger.info("Found target user: ID=%s, name=%s", target_user.id, target_user.first_name)
+        except Exception as e:
+            logger.error("Could not find user @%s: %s", clean_username, e)
+            raise PPVFlowError(f"Could not find user @{clean_username}: {e}")
+        
+        _USER_ENTITY_CACHE[cache_key] = target_user
+        return target_user
+
+
+async def handle_user_selection(client: TelegramClient, conv, message, username: str, target_user):
     """
     Handle the user selection step using SendBotRequestedPeerRequest.
     
@@ -216,47 +385,39 @@ async def handle_user_selection(client: TelegramClient, conv, message, username:
         conv: Active conversation with the bot
         message: Message with Select User button
         username: Target username to select
+        target_user: Already resolved user entity
         
     Returns:
         Response message from the bot after selection
     """
-    logger.info(f"=== Handling user selection for @{username} ===")
+    logger.info("=== Handling user selection for @%s ===", username)
     
     # Log full message details to understand the interface
     log_message_details(message, "User Selection Step")
     
     # Clean username (remove @ if present)
     clean_username = username.lstrip("@")
-    logger.debug(f"Clean username: {clean_username}")
+    logger.debug("Clean username: %s", clean_username)
     
     # Find the RequestPeer button
     button_id = None
-    if message.reply_markup:
-        for row in message.reply_markup.rows:
-            for button in row.buttons:
-                if isinstance(button, KeyboardButtonRequestPeer):
-                    button_id = button.button_id
-                    logger.info(f"Found RequestPeer button with ID: {button_id}")
-                    logger.info(f"  Peer type: {button.peer_type}")
-                    break
-            if button_id is not None:
-                break
+    if message.buttons:
+        button = next((
+            b.button for _, _, b in _iter_buttons(message.buttons)
+            if isinstance(b.button, KeyboardButtonRequestPeer)
+        ), None)
+        if button is not None:
+            button_id = button.button_id
+            logger.info("Found RequestPeer button with ID: %s", button_id)
+            logger.info("  Peer type: %s", button.peer_type)
     
     if button_id is None:
         logger.error("Could not find RequestPeer button in message")
         raise PPVFlowError("Could not find user selection button")
     
-    # Get the target user entity
-    try:
-        target_user = await client.get_entity(clean_username)
-        logger.info(f"Found target user: ID={target_user.id}, name={target_user.first_name}")
-    except Exception as e:
-        logger.error(f"Could not find user @{clean_username}: {e}")
-        raise PPVFlowError(f"Could not find user @{clean_username}: {e}")
-    
     # Get the bot entity (staccerbot)
-    staccerbot = await client.get_entity(STACCERBOT_USERNAME)
-    logger.info(f"Sending requested peer to bot (msg_id={message.id}, button_id={button_id})")
+    staccerbot = await get_staccerbot(client)
+    logger.info("Sending requested peer to bot (msg_id=%s, button_id=%s)", message.id, button_id)
     
     # Send the selected peer to the bot using SendBotRequestedPeerRequest
     try:
@@ -269,24 +430,42 @@ async def handle_user_selection(client: TelegramClient, conv, message, username:
                 access_hash=target_user.access_hash
             )]
         ))
-        logger.info(f"SendBotRequestedPeerRequest successful: {result}")
+        logger.info("SendBotRequestedPeerRequest successful: %s", result)
     except Exception as e:
-        logger.error(f"SendBotRequestedPeerRequest failed: {e}")
+        logger.error("SendBotRequestedPeerRequest failed: %s", e)
         raise PPVFlowError(f"Failed to select user: {e}")
     
     # Wait for bot confirmation
     logger.info("Waiting for bot response after user selection...")
     response = await wait_for_response(conv, timeout=30)
-    log_message_details(response, "User Selection Response")
+    if logger.isEnabledFor(logging.DEBUG):
+        log_message_details(response, "User Selection Response")
     
     return response
 
 
+async def _delete_quick_message(quick_msg):
+    """Delete the contact-establishing message, logging any failure."""
+    try:
+        await quick_msg.delete()
+        logger.info("Quick message deleted")
+    except Exception as e:
+        logger.error("Failed to delete quick message: %s", e)
+
+
+def _run_in_background(coro):
+    """Schedule a fire-and-forget coroutine, keeping a reference until it finishes."""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
 async def send_ppv(
     client: TelegramClient,
     photo_url: str,
     username: str,
-    stars: int
+    stars: int,
+    target_user=None
 ) -> dict:
     """
     Execute the complete PPV sending flow with staccerbot.
@@ -296,60 +475,56 @@ async def send_ppv(
         photo_url: URL of the photo to send as PPV
         username: Target username to send PPV to
         stars: Number of stars to charge
+        target_user: Already resolved entity for username (optional)
         
     Returns:
         dict with status and message
     """
-    logger.info("=" * 60)
-    logger.info(f"STARTING PPV FLOW")
-    logger.info(f"  Photo URL: {photo_url}")
-    logger.info(f"  Target user: @{username}")
-    logger.info(f"  Stars: {stars}")
-    logger.info("=" * 60)
-    
-    # Download photo first
-    try:
-        photo_bytes = await download_photo(photo_url)
-        logger.info(f"Photo downloaded: {len(photo_bytes)} bytes")
-    except Exception as e:
-        logger.exception(f"Failed to download photo: {e}")
-        raise PPVFlowError(f"Failed to download photo: {e}")
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("=" * 60)
+        logger.info("STARTING PPV FLOW")
+        logger.info("  Photo URL: %s", photo_url)
+        logger.info("  Target user: @%s", username)
+        logger.info("  Stars: %s", stars)
+        logger.info("=" * 60)
+    
+    # Download photo and get staccerbot entity concurrently
+    photo_file, staccerbot = await asyncio.gather(
+        download_photo(photo_url),
+        get_staccerbot(client),
+        return_exceptions=True
+    )
     
-    # Get staccerbot entity
-    try:
-        staccerbot = await client.get_entity(STACCERBOT_USERNAME)
-        logger.info(f"Found staccerbot: ID={staccerbot.id}, username=@{staccerbot.username}")
-    except Exception as e:
-        logger.exception(f"Failed to find staccerbot: {e}")
-        raise PPVFlowError(f"Failed to find @{STACCERBOT_USERNAME}: {e}")
+    if isinstance(photo_file, Exception):
+        logger.error("Failed to download photo: %s", photo_file, exc_info=photo_file)
+        raise PPVFlowError(f"Failed to download photo: {photo_file}") from photo_file
+    logger.info("Photo downloaded: %s bytes", photo_file.getbuffer().nbytes)
+    
+    if isinstance(staccerbot, Exception):
+        logger.error("Failed to find staccerbot: %s", staccerbot, exc_info=staccerbot)
+        raise PPVFlowError(f"Failed to find @{STACCERBOT_USERNAME}: {staccerbot}") from staccerbot
+    logger.info("Found staccerbot: ID=%s, username=@%s", staccerbot.user_id, STACCERBOT_USERNAME)
     
-    logger.info(f"Starting conversation with @{STACCERBOT_USERNAME}")
+    logger.info("Starting conversation with @%s", STACCERBOT_USERNAME)
     
     async with client.conversation(staccerbot, timeout=30) as conv:
         # =====================
         # Step 1: Send /sell command
         # =====================
-        logger.info("")
-        logger.info("=" * 40)
-        logger.info("STEP 1: Sending /sell command")
-        logger.info("=" * 40)
+        _log_step("STEP 1: Sending /sell command")
         await conv.send_message("/sell")
         response = await wait_for_response(conv, timeout=30)
         log_message_details(response, "Step 1 Response")
         
         # Expected: "Will do. Send a photo or a video to start, boss."
-        if "send a photo" not in response.text.lower() and "send" not in response.text.lower():
-            logger.warning(f"Unexpected response to /sell: {response.text}")
+        if not _SELL_PROMPT_RE.search(response.text):
+            logger.warning("Unexpected response to /sell: %s", response.text)
         
         # =====================
         # Step 2: Send photo
         # =====================
-        logger.info("")
-        logger.info("=" * 40)
-        logger.info("STEP 2: Sending photo")
-        logger.info("=" * 40)
-        # Create BytesIO with name attribute so Telethon recognizes it as an image
-        photo_file = io.BytesIO(photo_bytes)
+        _log_step("STEP 2: Sending photo")
+        # Name the BytesIO so Telethon recognizes it as an image
         photo_file.name = "photo.jpg"  # This tells Telethon it's an image
         
         await conv.send_file(
@@ -365,10 +540,7 @@ async def send_ppv(
         # =====================
         # Step 3: Click "Empty" button for no caption
         # =====================
-        logger.info("")
-        logger.info("=" * 40)
-        logger.info("STEP 3: Clicking 'Empty' button")
-        logger.info("=" * 40)
+        _log_step("STEP 3: Clicking 'Empty' button")
         if not await find_and_click_button(response, "Empty"):
             logger.warning("Could not find 'Empty' button, sending 'Empty' as text")
             await conv.send_message("Empty")
@@ -381,10 +553,7 @@ async def send_ppv(
         # =====================
         # Step 4: Send stars amount
         # =====================
-        logger.info("")
-        logger.info("=" * 40)
-        logger.info(f"STEP 4: Sending stars amount: {stars}")
-        logger.info("=" * 40)
+        _log_step("STEP 4: Sending stars amount: %s", stars)
         await conv.send_message(str(stars))
         response = await wait_for_response(conv, timeout=30)
         log_message_details(response, "Step 4 Response")
@@ -395,48 +564,42 @@ async def send_ppv(
         # =====================
         # Step 5: Handle user selection (with retry logic)
         # =====================
-        logger.info("")
-        logger.info("=" * 40)
-        logger.info(f"STEP 5: Selecting user @{username}")
-        logger.info("=" * 40)
+        _log_step("STEP 5: Selecting user @%s", username)
+        
+        # Resolve the target once; selection and contact retries reuse it
+        if target_user is None:
+            target_user = await resolve_user(client, username)
         
         max_retries = 2
         retry_count = 0
         
         while retry_count <= max_retries:
             # Handle the user selection using SendBotRequestedPeerRequest
-            response = await handle_user_selection(client, conv, response, username)
+            response = await handle_user_selection(client, conv, response, username, target_user)
             
             # Check for "no exchange in 48h" error
-            if "no exchange" in response.text.lower() or "48h" in response.text.lower():
+            if _NO_EXCHANGE_RE.search(response.text):
                 retry_count += 1
-                logger.warning(f"Got 'no exchange in 48h' error (retry {retry_count}/{max_retries})")
+                logger.warning("Got 'no exchange in 48h' error (retry %s/%s)", retry_count, max_retries)
                 
                 if retry_count > max_retries:
                     logger.error("Max retries exceeded for establishing contact")
                     raise PPVFlowError("Cannot send PPV: no recent exchange with user and retries exhausted")
                 
                 # Need to establish contact first by sending a quick message
-                logger.info(f"Establishing contact with @{username}...")
+                logger.info("Establishing contact with @%s...", username)
                 
                 try:
-                    # Get target user entity
-                    clean_username = username.lstrip("@")
-                    target_user = await client.get_entity(clean_username)
-                    
                     # Send a quick message to the target user
                     quick_msg = await client.send_message(target_user, "Hey! 👋")
-                    logger.info(f"Sent quick message to @{username}, message ID: {quick_msg.id}")
-                    
-                    # Wait a bit
-                    await asyncio.sleep(2)
+                    logger.info("Sent quick message to @%s, message ID: %s", username, quick_msg.id)
                     
-                    # Delete the message
-                    await quick_msg.delete()
-                    logger.info("Quick message deleted")
+                    # Delete the message in the background while we retry; the
+                    # exchange is recorded when the message is sent, not when it is read
+                    _run_in_background(_delete_quick_message(quick_msg))
                     
                 except Exception as e:
-                    logger.error(f"Failed to send/delete quick message: {e}")
+                    logger.error("Failed to send quick message: %s", e)
                     # Continue anyway, try the retry button
                 
                 # Click "Try again" button
@@ -445,13 +608,14 @@ async def send_ppv(
                     await response.click(data=b"sell_refresh")
                     logger.info("Clicked 'Try again' button")
                 except Exception as e:
-                    logger.warning(f"Could not click by data, trying by text: {e}")
+                    logger.warning("Could not click by data, trying by text: %s", e)
                     if not await find_and_click_button(response, "Try again"):
                         raise PPVFlowError("Could not find 'Try again' button")
                 
                 # Wait for bot to ask for user selection again
                 response = await wait_for_response(conv, timeout=30)
-                log_message_details(response, "After Try Again Response")
+                if logger.isEnabledFor(logging.DEBUG):
+                    log_message_details(response, "After Try Again Response")
                 
                 # Continue the loop to try user selection again
                 continue
@@ -464,16 +628,13 @@ async def send_ppv(
         # =====================
         # Wait for final confirmation
         # =====================
-        logger.info("")
-        logger.info("=" * 40)
-        logger.info("Waiting for final confirmation...")
-        logger.info("=" * 40)
+        _log_step("Waiting for final confirmation...")
         try:
             final_response = await wait_for_response(conv, timeout=60)
             log_message_details(final_response, "Final Response")
             
             # Expected: "Done deal, PPV sent."
-            if "done" in final_response.text.lower() or "sent" in final_response.text.lower():
+            if _DONE_RE.search(final_response.text):
                 logger.info("SUCCESS: PPV sent successfully!")
                 return {
                     "status": "success",
@@ -482,7 +643,7 @@ async def send_ppv(
                 }
         except PPVFlowError:
             # If we timeout waiting for final confirmation, check the last response
-            if "preparing" in response.text.lower():
+            if _PREPARING_RE.search(response.text):
                 logger.info("PPV appears to be preparing, assuming success")
                 return {
                     "status": "success",
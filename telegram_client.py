@@ -1,14 +1,28 @@
+import asyncio
+import getpass
 import logging
+import time
 from telethon import TelegramClient
+from telethon.errors import SessionPasswordNeededError
 from telethon.sessions import StringSession
+from telethon.tl.types import InputPeerUser
 
-from config import API_ID, API_HASH, SESSION_STRING
+from config import API_ID, API_HASH, SESSION_STRING, STACCERBOT_USERNAME
 
 logger = logging.getLogger(__name__)
 
 # Singleton client instance
 _client: TelegramClient | None = None
 
+# Monotonic time of the last successful connection/authorization check
+_last_check = 0.0
+_CHECK_TTL = 1.0
+_init_lock = asyncio.Lock()
+
+# Resolved bot entities, keyed by username (stable for the session)
+_ENTITY_CACHE: dict[str, InputPeerUser] = {}
+_ENTITY_LOCK = asyncio.Lock()
+
 
 def get_client() -> TelegramClient:
     """Get or create the Telethon client singleton."""
@@ -28,25 +42,72 @@ def get_client() -> TelegramClient:
 
 
 async def ensure_connected() -> TelegramClient:
-    """Ensure client is connected and return it."""
+    """
+    Ensure client is connected and return it.
+    
+    A successful check is reused for _CHECK_TTL seconds, and concurrent
+    callers share a single connect/authorization check.
+    """
+    global _last_check
+    
     client = get_client()
     
-    if not client.is_connected():
-        await client.connect()
-        logger.info("Telegram client connected")
+    if time.monotonic() - _last_check < _CHECK_TTL:
+        return client
     
-    if not await client.is_user_authorized():
-        raise RuntimeError(
-            "Client is not authorized. Please run generate_session() first "
-            "to authenticate and generate a SESSION_STRING."
-        )
+    # Only one coroutine connects/checks authorization at a time; the rest
+    # wait and then take the fast path above
+    async with _init_lock:
+        now = time.monotonic()
+        if now - _last_check < _CHECK_TTL:
+            return client
+        
+        if not client.is_connected():
+            await client.connect()
+            logger.info("Telegram client connected")
+        
+        if not await client.is_user_authorized():
+            raise RuntimeError(
+                "Client is not authorized. Please run generate_session() first "
+                "to authenticate and generate a SESSION_STRING."
+            )
+        
+        _last_check = now
+        return client
+
+
+async def get_bot_entity(client: TelegramClient, bot_username: str) -> InputPeerUser:
+    """
+    Resolve a bot username to its input entity, memoized per username.
     
-    return client
+    Only the first call per username hits Telegram (resolveUsername);
+    later calls are served from _ENTITY_CACHE.
+    """
+    async with _ENTITY_LOCK:
+        bot_entity = _ENTITY_CACHE.get(bot_username)
+        if bot_entity is None:
+            bot_entity = await client.get_input_entity(bot_username)
+            _ENTITY_CACHE[bot_username] = bot_entity
+            logger.info("Resolved @%s: ID=%s", bot_username, bot_entity.user_id)
+        return bot_entity
+
+
+def invalidate_entity_cache():
+    """Drop cached bot entities (done on disconnect)."""
+    _ENTITY_CACHE.clear()
+
+
+async def get_staccerbot(client: TelegramClient) -> InputPeerUser:
+    """Get the staccerbot input entity, resolving it only on first use."""
+    return await get_bot_entity(client, STACCERBOT_USERNAME)
 
 
 async def disconnect():
     """Disconnect the client if connected."""
-    global _client
+    global _client, _last_check
+    
+    _last_check = 0.0
+    invalidate_entity_cache()
     
     if _client and _client.is_connected():
         await _client.disconnect()
@@ -62,19 +123,19 @@ async def generate_session():
     
     await client.connect()
     
+    # Prompt in a thread so Telethon's background tasks keep running
+    loop = asyncio.get_running_loop()
+    
     if not await client.is_user_authorized():
-        phone = input("Enter your phone number (with country code): ")
+        phone = await loop.run_in_executor(None, input, "Enter your phone number (with country code): ")
         await client.send_code_request(phone)
         
-        code = input("Enter the code you received: ")
+        code = await loop.run_in_executor(None, input, "Enter the code you received: ")
         try:
             await client.sign_in(phone, code)
-        except Exception as e:
-            if "Two-steps verification" in str(e) or "password" in str(e).lower():
-                password = input("Enter your 2FA password: ")
-                await client.sign_in(password=password)
-            else:
-                raise
+        except SessionPasswordNeededError:
+            password = await loop.run_in_executor(None, getpass.getpass, "Enter your 2FA password: ")
+            await client.sign_in(password=password)
     
     session_string = client.session.save()
     print("\n" + "=" * 60)
@@ -89,5 +150,4 @@ async def generate_session():
 
 
 if __name__ == "__main__":
-    import asyncio
     asyncio.run(generate_session())
@@ -25,15 +25,16 @@ async def test():
     staccerbot = await client.get_entity("@staccerbot")
     print(f"Found: {staccerbot.id}")
     
-    print("Sending /sell...")
-    await client.send_message(staccerbot, "/sell")
-    await asyncio.sleep(2)
-    
-    print("Sending photo...")
-    result = await client.send_file(staccerbot, photo_bytes, caption="")
-    print(f"Photo sent! Message ID: {result.id}")
-    
-    await asyncio.sleep(3)
+    async with client.conversation(staccerbot, timeout=30) as conv:
+        print("Sending /sell...")
+        await conv.send_message("/sell")
+        await conv.get_response()
+        
+        print("Sending photo...")
+        result = await conv.send_file(photo_bytes, caption="")
+        print(f"Photo sent! Message ID: {result.id}")
+        
+        await conv.get_response()
     
     # Check last messages
     print("\nLast 5 messages in chat:")
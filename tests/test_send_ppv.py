@@ -0,0 +1,61 @@
+"""Smoke test for /send-ppv, driven with a fake Telethon client."""
+import pytest
+from fastapi.testclient import TestClient
+from telethon.tl.types import InputPeerUser
+
+import business_settings
+import main
+import ppv_flow
+import telegram_client
+from config import STACCERBOT_USERNAME, KIMFEETGURU_BOT_USERNAME
+
+
+class FakeClient:
+    """Records the business bots connected through UpdateConnectedBotRequest."""
+
+    def __init__(self):
+        self.entities = {}
+        self.connected_bots = []
+
+    async def get_input_entity(self, username):
+        entity = InputPeerUser(user_id=len(self.entities) + 1, access_hash=0)
+        self.entities[entity.user_id] = username
+        return entity
+
+    async def __call__(self, request):
+        self.connected_bots.append(self.entities[request.bot.user_id])
+
+
+@pytest.fixture
+def fake_client(monkeypatch):
+    client = FakeClient()
+
+    async def ensure_connected():
+        return client
+
+    async def resolve_user(client, username):
+        return InputPeerUser(user_id=1000, access_hash=0)
+
+    async def send_ppv(client, photo_url, username, stars, target_user=None):
+        assert target_user.user_id == 1000
+        return {"status": "success", "message": f"PPV sent to @{username}", "username": username}
+
+    monkeypatch.setattr(main, "ensure_connected", ensure_connected)
+    monkeypatch.setattr(ppv_flow, "resolve_user", resolve_user)
+    monkeypatch.setattr(ppv_flow, "send_ppv", send_ppv)
+    monkeypatch.setattr(business_settings, "_current_bot", None)
+    telegram_client.invalidate_entity_cache()
+    yield client
+    telegram_client.invalidate_entity_cache()
+
+
+def test_send_ppv_switches_bot_and_back(fake_client):
+    response = TestClient(main.app).post(
+        "/send-ppv",
+        json={"photo_url": "https://example.com/photo.jpg", "username": "someone", "stars": 5}
+    )
+
+    assert response.status_code == 200, response.text
+    assert response.json() == {"status": "success", "message": "PPV sent to @someone", "username": "someone"}
+    assert fake_client.connected_bots == [STACCERBOT_USERNAME, KIMFEETGURU_BOT_USERNAME]
+    assert main._ppv_in_flight == 0